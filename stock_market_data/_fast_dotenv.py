@@ -0,0 +1,44 @@
+"""
+Minimal .env loader for the standalone scripts.
+
+The test/setup scripts only need a handful of KEY=value pairs, so this
+replaces python-dotenv's regex-driven parser with a single read and one
+split per line. Existing environment variables are never overwritten,
+matching load_dotenv's default behavior.
+"""
+
+import functools
+import os
+import types
+
+def load_dotenv(path: str = '.env') -> bool:
+    """Load KEY=value pairs from a .env file into os.environ"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return False
+
+    for line in data.splitlines():
+        line = line.strip()
+        if not line or line.startswith(b'#'):
+            continue
+        key, sep, value = line.partition(b'=')
+        if not sep:
+            continue
+        os.environ.setdefault(
+            key.strip().decode(),
+            value.strip().strip(b'"\'').decode()
+        )
+    return True
+
+@functools.lru_cache(maxsize=1)
+def env() -> types.MappingProxyType:
+    """Parse .env once per process and return a read-only snapshot.
+
+    Repeated client construction in the scripts re-triggered load_dotenv
+    plus os.getenv lookups; this caches the merged mapping so the parse
+    happens exactly once.
+    """
+    load_dotenv()
+    return types.MappingProxyType(dict(os.environ))
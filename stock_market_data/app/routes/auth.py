@@ -123,6 +123,13 @@ async def logout(request: LogoutRequest):
                     "active": False,
                     "logoutAt": datetime.utcnow()
                 })
+                
+                # Drop the cached session so the token stops validating now
+                # rather than when its TTL expires (lazy import avoids a
+                # circular dependency with main)
+                from main import invalidate_session_cache
+                invalidate_session_cache(request.session_id)
+                
                 logger.info(f"User logged out successfully: {request.session_id}")
             except Exception as e:
                 logger.warning(f"Failed to update Firestore: {e}")
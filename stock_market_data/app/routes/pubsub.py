@@ -1,4 +1,8 @@
+import asyncio
+import time
+import orjson
 from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import Response
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import logging
@@ -14,6 +18,14 @@ router = APIRouter()
 # Initialize Pub/Sub consumer
 pubsub_consumer = PubSubConsumer()
 
+# Limit concurrent publishes so the Pub/Sub client's batcher sees parallel
+# enqueues without unbounded task creation on large batches
+_publish_semaphore = asyncio.Semaphore(64)
+
+async def _publish_screentime_event(enriched_data: Dict[str, Any]):
+    async with _publish_semaphore:
+        await pubsub_consumer.publish_screentime_data(enriched_data)
+
 class ScreentimeEvent(BaseModel):
     device_id: str
     user_id: str
@@ -46,10 +58,9 @@ async def receive_screentime_data(request: ScreentimeBatch):
     try:
         logger.info(f"Received screentime batch from {request.device_id}: {request.batch_size} events")
         
-        # Process each event
-        for event in request.events:
-            # Enrich the data
-            enriched_data = {
+        # Enrich all events first
+        enriched_list = [
+            {
                 'device_id': event.device_id,
                 'user_id': event.user_id,
                 'event_type': event.event_type,
@@ -61,13 +72,20 @@ async def receive_screentime_data(request: ScreentimeBatch):
                 'source': event.source,
                 'received_at': datetime.utcnow().isoformat()
             }
-            
-            # Try to publish to Pub/Sub
-            try:
-                await pubsub_consumer.publish_screentime_data(enriched_data)
+            for event in request.events
+        ]
+
+        # Publish concurrently so the client's batcher can coalesce them;
+        # log failures afterwards without aborting the route
+        results = await asyncio.gather(
+            *(_publish_screentime_event(enriched) for enriched in enriched_list),
+            return_exceptions=True
+        )
+        for event, result in zip(request.events, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to publish to Pub/Sub: {result}")
+            else:
                 logger.debug(f"Published screentime event: {event.event_type}")
-            except Exception as e:
-                logger.warning(f"Failed to publish to Pub/Sub: {e}")
         
         return {
             "success": True,
@@ -118,17 +136,31 @@ async def receive_market_data(request: MarketDataEvent):
         logger.error(f"Error processing market data: {e}")
         raise HTTPException(status_code=500, detail="Failed to process market data")
 
+# Pre-serialized health response; probes hit this endpoint every few
+# seconds, so only refresh the timestamp when the cached bytes go stale
+_HEALTH_TTL_SECONDS = 5.0
+_health_bytes = b''
+_health_refreshed_at = 0.0
+
+def _build_health_bytes() -> bytes:
+    return orjson.dumps({
+        "status": "healthy",
+        "service": "pubsub-receiver",
+        "endpoints": ["/screentime", "/market"],
+        "timestamp": datetime.utcnow().isoformat()
+    })
+
 @router.get("/health")
 async def pubsub_health():
     """
     Health check for Pub/Sub endpoints
     """
-    return {
-        "status": "healthy",
-        "service": "pubsub-receiver",
-        "endpoints": ["/screentime", "/market"],
-        "timestamp": datetime.utcnow().isoformat()
-    }
+    global _health_bytes, _health_refreshed_at
+    now = time.monotonic()
+    if not _health_bytes or now - _health_refreshed_at > _HEALTH_TTL_SECONDS:
+        _health_bytes = _build_health_bytes()
+        _health_refreshed_at = now
+    return Response(content=_health_bytes, media_type="application/json")
 
 def _categorize_app(app_name: str) -> str:
     """Categorize applications for screentime analysis"""
@@ -1,7 +1,13 @@
-import requests
+import httpx
+import orjson
 from datetime import datetime, timedelta
+import asyncio
 import json
 import logging
+import re
+import time
+from collections import Counter
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from fastapi import APIRouter
@@ -12,7 +18,38 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-@dataclass
+# Shared default so .get chains don't allocate a fresh dict per event
+_EMPTY_EVENT_DATA: Dict[str, Any] = {}
+
+# Static ActivityWatch query templates; only the bucket names (and an
+# optional limit) vary per call
+_SCREENTIME_QUERY_TMPL = (
+    'window_events = flood(query_bucket(find_bucket("{wb}")));',
+    'afk_events = flood(query_bucket(find_bucket("{ab}")));',
+    'not_afk = filter_keyvals(afk_events, "status", ["not-afk"]);',
+    'active_window_events = filter_period_intersect(window_events, not_afk);',
+    'merged_events = merge_events_by_keys(active_window_events, ["app"]);',
+    'sorted_events = sort_by_duration(merged_events);',
+)
+
+_DETAILED_QUERY_TMPL = (
+    'window_events = flood(query_bucket(find_bucket("{wb}")));',
+    'afk_events = flood(query_bucket(find_bucket("{ab}")));',
+    'not_afk = filter_keyvals(afk_events, "status", ["not-afk"]);',
+    'active_window_events = filter_period_intersect(window_events, not_afk);',
+    'merged_by_app_title = merge_events_by_keys(active_window_events, ["app", "title"]);',
+    'sorted_events = sort_by_duration(merged_by_app_title);',
+    'RETURN = sorted_events;',
+)
+
+_WEB_QUERY_TMPL = (
+    'web_events = flood(query_bucket(find_bucket("{wb}")));',
+    'merged_web = merge_events_by_keys(web_events, ["url"]);',
+    'sorted_web = sort_by_duration(merged_web);',
+    'RETURN = sorted_web;',
+)
+
+@dataclass(slots=True, frozen=True)
 class ScreenTimeRecord:
     user_id: str
     app_name: str
@@ -25,7 +62,21 @@ class ActivityWatchQueryIntegration:
     def __init__(self, aw_base_url: str = "http://localhost:5600", backend_url: str = None):
         self.aw_base_url = aw_base_url
         self.backend_url = backend_url
-        
+
+        # Long-lived HTTP client with keep-alive so repeated ActivityWatch
+        # and backend calls reuse the same sockets
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=30.0
+        )
+
+        # Buckets change rarely; cache the listing and resolved hostname
+        # so a summary needs one bucket fetch instead of three or more
+        self._buckets_ttl = 60.0
+        self._buckets_cache: Optional[Dict[str, List[str]]] = None
+        self._buckets_cached_at = 0.0
+        self._cached_hostname: Optional[str] = None
+
         # App categorization mapping
         self.app_categories = {
             # Web Browsers
@@ -115,42 +166,87 @@ class ActivityWatchQueryIntegration:
             'TikTok': 'Social Media',
             'Reddit': 'Social Media',
         }
-    
-    def categorize_app(self, app_name: str) -> str:
+
+        # Fallback keyword rules, checked after the known-app patterns
+        keyword_rules = [
+            ('chrome', 'Web Browsing'), ('firefox', 'Web Browsing'),
+            ('safari', 'Web Browsing'), ('edge', 'Web Browsing'),
+            ('browser', 'Web Browsing'),
+            ('code', 'Productivity'), ('studio', 'Productivity'),
+            ('pycharm', 'Productivity'), ('intellij', 'Productivity'),
+            ('vim', 'Productivity'), ('emacs', 'Productivity'),
+            ('terminal', 'Development'), ('cmd', 'Development'),
+            ('powershell', 'Development'), ('bash', 'Development'),
+            ('shell', 'Development'),
+            ('word', 'Productivity'), ('excel', 'Productivity'),
+            ('powerpoint', 'Productivity'), ('office', 'Productivity'),
+            ('docs', 'Productivity'), ('sheets', 'Productivity'),
+            ('slack', 'Communication'), ('teams', 'Communication'),
+            ('discord', 'Communication'), ('zoom', 'Communication'),
+            ('skype', 'Communication'), ('chat', 'Communication'),
+            ('spotify', 'Entertainment'), ('music', 'Entertainment'),
+            ('video', 'Entertainment'), ('player', 'Entertainment'),
+            ('media', 'Entertainment'),
+        ]
+
+        # Lowercased copy for case-insensitive direct lookups without
+        # re-lowering the known names on every call
+        self._app_categories_lower = {k.lower(): v for k, v in self.app_categories.items()}
+
+        # Build a single compiled alternation over every known app name,
+        # each individual word of those names (so variants like
+        # "Chrome" still hit "Google Chrome") and the keyword rules.
+        # One regex search replaces the per-call linear scans.
+        self._pattern_categories = {}
+        for known_app, category in self.app_categories.items():
+            known_lower = known_app.lower()
+            self._pattern_categories.setdefault(known_lower, category)
+            for word in known_lower.split():
+                if len(word) >= 4:
+                    self._pattern_categories.setdefault(word, category)
+        for keyword, category in keyword_rules:
+            self._pattern_categories.setdefault(keyword, category)
+
+        # Longest patterns first so the most specific match wins
+        self._category_matcher = re.compile('|'.join(
+            re.escape(pattern)
+            for pattern in sorted(self._pattern_categories, key=len, reverse=True)
+        ))
+
+        # Memoize per instance: app names repeat heavily across a day's
+        # events, so the matcher only runs once per unique name
+        self.categorize_app = lru_cache(maxsize=4096)(self._categorize_app_uncached)
+
+    def _categorize_app_uncached(self, app_name: str) -> str:
         """Categorize an app based on its name"""
-        # Direct match
-        if app_name in self.app_categories:
-            return self.app_categories[app_name]
-        
-        # Partial matching for apps with version numbers or variants
+        # Lower once, then try a direct match against the precomputed map
         app_lower = app_name.lower()
-        for known_app, category in self.app_categories.items():
-            if known_app.lower() in app_lower or app_lower in known_app.lower():
-                return category
-        
-        # Special case handling
-        if any(browser in app_lower for browser in ['chrome', 'firefox', 'safari', 'edge', 'browser']):
-            return 'Web Browsing'
-        elif any(dev_tool in app_lower for dev_tool in ['code', 'studio', 'pycharm', 'intellij', 'vim', 'emacs']):
-            return 'Productivity'
-        elif any(terminal in app_lower for terminal in ['terminal', 'cmd', 'powershell', 'bash', 'shell']):
-            return 'Development'
-        elif any(office in app_lower for office in ['word', 'excel', 'powerpoint', 'office', 'docs', 'sheets']):
-            return 'Productivity'
-        elif any(comm in app_lower for comm in ['slack', 'teams', 'discord', 'zoom', 'skype', 'chat']):
-            return 'Communication'
-        elif any(media in app_lower for media in ['spotify', 'music', 'video', 'player', 'media']):
-            return 'Entertainment'
-        
+        category = self._app_categories_lower.get(app_lower)
+        if category:
+            return category
+
+        # Single-pass pattern match covering known apps, their name
+        # fragments and the fallback keywords
+        match = self._category_matcher.search(app_lower)
+        if match:
+            return self._pattern_categories[match.group(0)]
+
         return 'Other'
     
-    def get_available_buckets(self) -> Dict[str, List[str]]:
-        """Get all available buckets from ActivityWatch"""
+    async def aclose(self):
+        """Close the underlying HTTP client (call on FastAPI shutdown)"""
+        await self._client.aclose()
+
+    async def get_available_buckets(self) -> Dict[str, List[str]]:
+        """Get all available buckets from ActivityWatch (cached with a TTL)"""
+        if self._buckets_cache is not None and time.monotonic() - self._buckets_cached_at < self._buckets_ttl:
+            return self._buckets_cache
+
         try:
-            response = requests.get(f"{self.aw_base_url}/api/0/buckets/")
+            response = await self._client.get(f"{self.aw_base_url}/api/0/buckets/")
             response.raise_for_status()
-            
-            buckets = response.json()
+
+            buckets = orjson.loads(response.content)
             categorized_buckets = {
                 'window': [],
                 'afk': [],
@@ -168,69 +264,75 @@ class ActivityWatchQueryIntegration:
                 else:
                     categorized_buckets['other'].append(bucket_id)
             
+            self._buckets_cache = categorized_buckets
+            self._buckets_cached_at = time.monotonic()
             return categorized_buckets
-            
-        except requests.RequestException as e:
+
+        except httpx.HTTPError as e:
             logger.error(f"Failed to get buckets: {e}")
             return {}
-    
-    def get_screentime_via_query(self, date_str: str, hostname: str = None) -> List[Dict[str, Any]]:
+
+    async def _resolve_hostname(self) -> Optional[str]:
+        """Detect the watcher hostname once and reuse it afterwards"""
+        if self._cached_hostname:
+            return self._cached_hostname
+
+        buckets = await self.get_available_buckets()
+        if buckets.get('window'):
+            self._cached_hostname = buckets['window'][0].split('_')[-1]
+        return self._cached_hostname
+
+    async def get_screentime_via_query(self, date_str: str, hostname: str = None,
+                                       limit: int = None) -> List[Dict[str, Any]]:
         """Get processed screentime data using ActivityWatch Query API"""
-        
+
         # Auto-detect hostname if not provided
         if not hostname:
-            buckets = self.get_available_buckets()
-            if buckets['window']:
-                # Extract hostname from first window bucket
-                hostname = buckets['window'][0].split('_')[-1]
-            else:
+            hostname = await self._resolve_hostname()
+            if not hostname:
                 raise Exception("No window buckets found. Make sure ActivityWatch is running and has collected data.")
         
         window_bucket = f"aw-watcher-window_{hostname}"
         afk_bucket = f"aw-watcher-afk_{hostname}"
         
-        # Build the query
+        # Build the query; cap the result server-side when the caller only
+        # needs the top events, so less JSON crosses the wire
+        query_lines = [line.format(wb=window_bucket, ab=afk_bucket)
+                       for line in _SCREENTIME_QUERY_TMPL]
+        if limit:
+            query_lines.append(f'sorted_events = limit_events(sorted_events, {int(limit)});')
+        query_lines.append('RETURN = sorted_events;')
+
         query = {
             "timeperiods": [f"{date_str}T00:00:00Z/{date_str}T23:59:59Z"],
-            "query": [
-                f'window_events = flood(query_bucket(find_bucket("{window_bucket}")));',
-                f'afk_events = flood(query_bucket(find_bucket("{afk_bucket}")));',
-                'not_afk = filter_keyvals(afk_events, "status", ["not-afk"]);',
-                'active_window_events = filter_period_intersect(window_events, not_afk);',
-                'merged_events = merge_events_by_keys(active_window_events, ["app"]);',
-                'sorted_events = sort_by_duration(merged_events);',
-                'RETURN = sorted_events;'
-            ]
+            "query": query_lines
         }
-        
+
         try:
-            response = requests.post(
+            response = await self._client.post(
                 f"{self.aw_base_url}/api/0/query/",
                 json=query,
-                headers={'Content-Type': 'application/json'},
-                timeout=30
+                headers={'Content-Type': 'application/json'}
             )
             response.raise_for_status()
-            
-            result = response.json()
+
+            result = orjson.loads(response.content)
             if result and len(result) > 0:
                 return result[0]  # First (and only) timeperiod result
             else:
                 logger.warning(f"No data returned for date {date_str}")
                 return []
-                
-        except requests.RequestException as e:
+
+        except httpx.HTTPError as e:
             logger.error(f"Failed to query ActivityWatch: {e}")
             raise Exception(f"ActivityWatch query failed: {e}")
-    
-    def get_detailed_screentime_with_titles(self, date_str: str, hostname: str = None) -> List[Dict[str, Any]]:
+
+    async def get_detailed_screentime_with_titles(self, date_str: str, hostname: str = None) -> List[Dict[str, Any]]:
         """Get detailed screentime including window titles"""
-        
+
         if not hostname:
-            buckets = self.get_available_buckets()
-            if buckets['window']:
-                hostname = buckets['window'][0].split('_')[-1]
-            else:
+            hostname = await self._resolve_hostname()
+            if not hostname:
                 raise Exception("No window buckets found.")
         
         window_bucket = f"aw-watcher-window_{hostname}"
@@ -239,74 +341,58 @@ class ActivityWatchQueryIntegration:
         # Query for detailed data with titles
         query = {
             "timeperiods": [f"{date_str}T00:00:00Z/{date_str}T23:59:59Z"],
-            "query": [
-                f'window_events = flood(query_bucket(find_bucket("{window_bucket}")));',
-                f'afk_events = flood(query_bucket(find_bucket("{afk_bucket}")));',
-                'not_afk = filter_keyvals(afk_events, "status", ["not-afk"]);',
-                'active_window_events = filter_period_intersect(window_events, not_afk);',
-                'merged_by_app_title = merge_events_by_keys(active_window_events, ["app", "title"]);',
-                'sorted_events = sort_by_duration(merged_by_app_title);',
-                'RETURN = sorted_events;'
-            ]
+            "query": [line.format(wb=window_bucket, ab=afk_bucket)
+                      for line in _DETAILED_QUERY_TMPL]
         }
-        
+
         try:
-            response = requests.post(
+            response = await self._client.post(
                 f"{self.aw_base_url}/api/0/query/",
                 json=query,
-                headers={'Content-Type': 'application/json'},
-                timeout=30
+                headers={'Content-Type': 'application/json'}
             )
             response.raise_for_status()
-            
-            result = response.json()
+
+            result = orjson.loads(response.content)
             return result[0] if result and len(result) > 0 else []
-                
-        except requests.RequestException as e:
+
+        except httpx.HTTPError as e:
             logger.error(f"Failed to query detailed ActivityWatch data: {e}")
             raise Exception(f"ActivityWatch detailed query failed: {e}")
-    
-    def get_web_activity(self, date_str: str, hostname: str = None) -> List[Dict[str, Any]]:
+
+    async def get_web_activity(self, date_str: str, hostname: str = None) -> List[Dict[str, Any]]:
         """Get web browsing activity if available"""
-        
+
         if not hostname:
-            buckets = self.get_available_buckets()
-            if buckets['window']:
-                hostname = buckets['window'][0].split('_')[-1]
-            else:
+            hostname = await self._resolve_hostname()
+            if not hostname:
                 return []
-        
+
         web_bucket = f"aw-watcher-web_{hostname}"
-        
+
         # Check if web bucket exists
-        buckets = self.get_available_buckets()
+        buckets = await self.get_available_buckets()
         if web_bucket not in buckets.get('web', []):
             logger.info(f"No web watcher data found for {hostname}")
             return []
         
         query = {
             "timeperiods": [f"{date_str}T00:00:00Z/{date_str}T23:59:59Z"],
-            "query": [
-                f'web_events = flood(query_bucket(find_bucket("{web_bucket}")));',
-                'merged_web = merge_events_by_keys(web_events, ["url"]);',
-                'sorted_web = sort_by_duration(merged_web);',
-                'RETURN = sorted_web;'
-            ]
+            "query": [line.format(wb=web_bucket) for line in _WEB_QUERY_TMPL]
         }
-        
+
         try:
-            response = requests.post(
+            response = await self._client.post(
                 f"{self.aw_base_url}/api/0/query/",
                 json=query,
-                headers={'Content-Type': 'application/json'},
-                timeout=30
+                headers={'Content-Type': 'application/json'}
             )
             response.raise_for_status()
-            
-            result = response.json()
+
+            result = orjson.loads(response.content)
             return result[0] if result and len(result) > 0 else []
-                
-        except requests.RequestException as e:
+
+        except httpx.HTTPError as e:
             logger.warning(f"Failed to get web activity: {e}")
             return []
     
@@ -314,68 +400,84 @@ class ActivityWatchQueryIntegration:
         """Convert ActivityWatch events to backend format"""
         
         records = []
-        
+
         for event in events:
-            app_name = event.get('data', {}).get('app', 'Unknown Application')
+            # Skip very short activities (less than 30 seconds) before any
+            # other per-event work
             duration_seconds = event.get('duration', 0)
-            duration_minutes = max(1, int(duration_seconds / 60))  # Minimum 1 minute, round down
-            
-            # Skip very short activities (less than 30 seconds)
             if duration_seconds < 30:
                 continue
-            
-            category = self.categorize_app(app_name)
-            
+
+            data = event.get('data') or _EMPTY_EVENT_DATA
+            app_name = data.get('app', 'Unknown Application')
+            duration_minutes = max(1, int(duration_seconds / 60))  # Minimum 1 minute, round down
+
             record = ScreenTimeRecord(
                 user_id=user_id,
                 app_name=app_name,
                 time_spent_minutes=duration_minutes,
-                category=category,
+                category=self.categorize_app(app_name),
                 date=date_str,
                 device_type="desktop"
             )
-            
+
             records.append(record)
-        
+
         return records
     
-    def get_activity_summary(self, date_str: str, hostname: str = None) -> Dict[str, Any]:
+    async def get_activity_summary(self, date_str: str, hostname: str = None) -> Dict[str, Any]:
         """Get a comprehensive activity summary for the day"""
-        
+
         try:
-            # Get basic screentime data
-            events = self.get_screentime_via_query(date_str, hostname)
-            
-            # Get detailed data with titles
-            detailed_events = self.get_detailed_screentime_with_titles(date_str, hostname)
-            
-            # Get web activity if available
-            web_events = self.get_web_activity(date_str, hostname)
-            
-            # Calculate summary statistics
-            total_time_seconds = sum(event.get('duration', 0) for event in events)
-            total_time_minutes = int(total_time_seconds / 60)
-            
-            # Category breakdown
-            category_times = {}
-            for event in events:
-                app_name = event.get('data', {}).get('app', 'Unknown')
-                category = self.categorize_app(app_name)
-                duration_minutes = int(event.get('duration', 0) / 60)
-                
-                category_times[category] = category_times.get(category, 0) + duration_minutes
-            
-            # Top applications
+            # Resolve the hostname once so the three queries below don't each
+            # re-fetch the bucket list
+            if not hostname:
+                hostname = await self._resolve_hostname()
+                if not hostname:
+                    raise Exception("No window buckets found. Make sure ActivityWatch is running and has collected data.")
+
+            # The two queries are independent round-trips; run them concurrently
+            detailed_events, web_events = await asyncio.gather(
+                self.get_detailed_screentime_with_titles(date_str, hostname),
+                self.get_web_activity(date_str, hostname)
+            )
+
+            # Derive the merged-by-app view from the detailed (app+title)
+            # result instead of issuing a third ActivityWatch query
+            app_durations = {}
+            for event in detailed_events:
+                app_name = (event.get('data') or _EMPTY_EVENT_DATA).get('app', 'Unknown')
+                app_durations[app_name] = app_durations.get(app_name, 0) + event.get('duration', 0)
+
+            events = [
+                {'data': {'app': app_name}, 'duration': duration}
+                for app_name, duration in sorted(app_durations.items(),
+                                                 key=lambda item: item[1], reverse=True)
+            ]
+
+            # Aggregate over the unique-app table rather than the raw events:
+            # one categorization and one Counter update per unique app
+            total_time_seconds = sum(app_durations.values())
+            app_category_cache = {app_name: self.categorize_app(app_name)
+                                  for app_name in app_durations}
+            category_seconds = Counter()
+            for app_name, duration_seconds in app_durations.items():
+                category_seconds[app_category_cache[app_name]] += duration_seconds
+
+            total_time_minutes = int(total_time_seconds) // 60
+            category_times = {category: int(seconds) // 60
+                              for category, seconds in category_seconds.items()}
+
+            # Top applications (events are already sorted by duration)
             top_apps = []
             for event in events[:10]:  # Top 10 apps
                 app_name = event.get('data', {}).get('app', 'Unknown')
-                duration_minutes = int(event.get('duration', 0) / 60)
-                category = self.categorize_app(app_name)
-                
+                duration_minutes = int(event.get('duration', 0)) // 60
+
                 top_apps.append({
                     'app_name': app_name,
                     'time_minutes': duration_minutes,
-                    'category': category,
+                    'category': app_category_cache.get(app_name, 'Other'),
                     'percentage': round((duration_minutes / total_time_minutes * 100), 1) if total_time_minutes > 0 else 0
                 })
             
@@ -422,60 +524,86 @@ class ActivityWatchQueryIntegration:
         
         return round(score, 1)
     
-    def send_to_backend(self, records: List[ScreenTimeRecord], auth_token: str) -> Dict[str, Any]:
+    async def send_to_backend(self, records: List[ScreenTimeRecord], auth_token: str,
+                              chunk_size: int = 5000) -> Dict[str, Any]:
         """Send processed data to your backend"""
-        
+
         if not self.backend_url:
             raise Exception("Backend URL not configured")
-        
-        # Convert records to dict format
-        data = [
-            {
-                "user_id": record.user_id,
-                "app_name": record.app_name,
-                "time_spent_minutes": record.time_spent_minutes,
-                "category": record.category,
-                "date": record.date,
-                "device_type": record.device_type
-            }
-            for record in records
-        ]
-        
+
         headers = {
             'Authorization': f'Bearer {auth_token}',
             'Content-Type': 'application/json'
         }
-        
+
         try:
-            response = requests.post(
-                f"{self.backend_url}/screentime/bulk-ingest",
-                headers=headers,
-                json=data,
-                timeout=30
-            )
-            response.raise_for_status()
-            
-            return response.json()
-            
-        except requests.RequestException as e:
+            # Encode one chunk at a time straight from the records, so the
+            # full list of dicts is never materialized alongside the records
+            responses = []
+            for i in range(0, len(records), chunk_size):
+                payload = orjson.dumps([
+                    {
+                        "user_id": record.user_id,
+                        "app_name": record.app_name,
+                        "time_spent_minutes": record.time_spent_minutes,
+                        "category": record.category,
+                        "date": record.date,
+                        "device_type": record.device_type
+                    }
+                    for record in records[i:i + chunk_size]
+                ])
+                response = await self._client.post(
+                    f"{self.backend_url}/screentime/bulk-ingest",
+                    headers=headers,
+                    content=payload
+                )
+                response.raise_for_status()
+                responses.append(orjson.loads(response.content))
+
+            if len(responses) == 1:
+                return responses[0]
+            return {'success': True, 'chunks': responses}
+
+        except httpx.HTTPError as e:
             logger.error(f"Failed to send data to backend: {e}")
             raise Exception(f"Backend submission failed: {e}")
 
+async def warm_connections(backend_url: str = None, aw_base_url: str = "http://localhost:5600"):
+    """
+    Prime DNS and TCP for ActivityWatch and the screentime backend at app
+    startup so the first user-triggered sync doesn't pay connection setup.
+    """
+    urls = [f"{aw_base_url}/api/0/buckets/"]
+    if backend_url:
+        urls.append(f"{backend_url}/health")
+
+    async with httpx.AsyncClient(timeout=5.0) as client:
+        for url in urls:
+            try:
+                await client.head(url)
+            except Exception as e:
+                # Warmup is best-effort; the services may simply not be up yet
+                logger.debug(f"Connection warmup skipped for {url}: {e}")
+
 # Main integration functions
-def sync_daily_screentime(user_id: str, auth_token: str, date_str: str = None, 
-                         backend_url: str = None, hostname: str = None) -> Dict[str, Any]:
+async def sync_daily_screentime(user_id: str, auth_token: str, date_str: str = None,
+                                backend_url: str = None, hostname: str = None,
+                                integration: ActivityWatchQueryIntegration = None) -> Dict[str, Any]:
     """Sync daily screentime from ActivityWatch to your backend"""
-    
+
     if not date_str:
         date_str = datetime.now().strftime('%Y-%m-%d')
-    
-    integration = ActivityWatchQueryIntegration(backend_url=backend_url)
-    
+
+    # Reuse the caller's integration (and its connection pool) if provided
+    owns_integration = integration is None
+    if owns_integration:
+        integration = ActivityWatchQueryIntegration(backend_url=backend_url)
+
     try:
         logger.info(f"Syncing screentime for {date_str}")
-        
+
         # Get data from ActivityWatch using Query API
-        events = integration.get_screentime_via_query(date_str, hostname)
+        events = await integration.get_screentime_via_query(date_str, hostname)
         
         if not events:
             logger.warning(f"No screentime data found for {date_str}")
@@ -492,7 +620,7 @@ def sync_daily_screentime(user_id: str, auth_token: str, date_str: str = None,
         
         # Send to backend if URL provided
         if backend_url and auth_token:
-            result = integration.send_to_backend(records, auth_token)
+            result = await integration.send_to_backend(records, auth_token)
             logger.info(f"Successfully synced to backend: {result}")
             return result
         else:
@@ -518,17 +646,20 @@ def sync_daily_screentime(user_id: str, auth_token: str, date_str: str = None,
             'error': str(e),
             'records_synced': 0
         }
+    finally:
+        if owns_integration:
+            await integration.aclose()
 
-def get_activity_report(date_str: str = None, hostname: str = None) -> Dict[str, Any]:
+async def get_activity_report(date_str: str = None, hostname: str = None) -> Dict[str, Any]:
     """Get a comprehensive activity report for analysis"""
-    
+
     if not date_str:
         date_str = datetime.now().strftime('%Y-%m-%d')
-    
+
     integration = ActivityWatchQueryIntegration()
-    
+
     try:
-        return integration.get_activity_summary(date_str, hostname)
+        return await integration.get_activity_summary(date_str, hostname)
     except Exception as e:
         logger.error(f"Error generating activity report: {e}")
         return {
@@ -536,41 +667,66 @@ def get_activity_report(date_str: str = None, hostname: str = None) -> Dict[str,
             'error': str(e),
             'total_time_minutes': 0
         }
+    finally:
+        await integration.aclose()
 
-def get_multi_day_sync(user_id: str, auth_token: str, start_date: str, end_date: str,
-                      backend_url: str = None, hostname: str = None) -> Dict[str, Any]:
+async def get_multi_day_sync(user_id: str, auth_token: str, start_date: str, end_date: str,
+                             backend_url: str = None, hostname: str = None) -> Dict[str, Any]:
     """Sync multiple days of screentime data"""
-    
+
     start = datetime.strptime(start_date, '%Y-%m-%d')
     end = datetime.strptime(end_date, '%Y-%m-%d')
-    
+
     results = []
     total_synced = 0
     errors = []
-    
-    current_date = start
-    while current_date <= end:
-        date_str = current_date.strftime('%Y-%m-%d')
-        
-        try:
-            result = sync_daily_screentime(user_id, auth_token, date_str, backend_url, hostname)
-            results.append({
-                'date': date_str,
-                'success': result.get('success', False),
-                'records': result.get('records_synced', 0)
-            })
-            total_synced += result.get('records_synced', 0)
-            
-        except Exception as e:
-            errors.append(f"{date_str}: {str(e)}")
-            results.append({
-                'date': date_str,
-                'success': False,
-                'error': str(e)
-            })
-        
-        current_date += timedelta(days=1)
-    
+
+    integration = ActivityWatchQueryIntegration(backend_url=backend_url)
+
+    dates = [(start + timedelta(days=d)).strftime('%Y-%m-%d')
+             for d in range((end - start).days + 1)]
+
+    # Fetch days concurrently, bounded so we don't flood ActivityWatch
+    sync_semaphore = asyncio.Semaphore(8)
+
+    async def _collect_one_day(date_str: str) -> List[ScreenTimeRecord]:
+        async with sync_semaphore:
+            events = await integration.get_screentime_via_query(date_str, hostname)
+            return integration.convert_to_backend_format(events, user_id, date_str)
+
+    try:
+        day_results = await asyncio.gather(
+            *(_collect_one_day(date_str) for date_str in dates),
+            return_exceptions=True
+        )
+
+        all_records = []
+        for date_str, day_records in zip(dates, day_results):
+            if isinstance(day_records, Exception):
+                errors.append(f"{date_str}: {str(day_records)}")
+                results.append({
+                    'date': date_str,
+                    'success': False,
+                    'error': str(day_records)
+                })
+            else:
+                all_records.extend(day_records)
+                results.append({
+                    'date': date_str,
+                    'success': True,
+                    'records': len(day_records)
+                })
+                total_synced += len(day_records)
+
+        # One batched bulk-ingest call instead of a POST per day
+        if backend_url and auth_token and all_records:
+            try:
+                await integration.send_to_backend(all_records, auth_token)
+            except Exception as e:
+                errors.append(f"bulk-ingest: {str(e)}")
+    finally:
+        await integration.aclose()
+
     return {
         'success': len(errors) == 0,
         'total_days': (end - start).days + 1,
@@ -583,25 +739,25 @@ def get_multi_day_sync(user_id: str, auth_token: str, start_date: str, end_date:
 if __name__ == "__main__":
     # Example 1: Get today's activity report
     print("=== Today's Activity Report ===")
-    report = get_activity_report()
+    report = asyncio.run(get_activity_report())
     print(json.dumps(report, indent=2))
     
     # Example 2: Sync today's data to backend
-    # sync_result = sync_daily_screentime(
+    # sync_result = asyncio.run(sync_daily_screentime(
     #     user_id="user123",
     #     auth_token="your-jwt-token",
     #     backend_url="https://your-backend-api.com"
-    # )
+    # ))
     # print(json.dumps(sync_result, indent=2))
-    
+
     # Example 3: Multi-day sync
-    # multi_sync = get_multi_day_sync(
+    # multi_sync = asyncio.run(get_multi_day_sync(
     #     user_id="user123",
     #     auth_token="your-jwt-token",
     #     start_date="2025-01-15",
     #     end_date="2025-01-20",
     #     backend_url="https://your-backend-api.com"
-    # )
+    # ))
     # print(json.dumps(multi_sync, indent=2))
 
     # Example FastAPI health check
@@ -1,4 +1,5 @@
-import json
+import asyncio
+import orjson
 from typing import Dict, Any
 from app.services.gemini import chat_with_gemini  # Should be async
 def ensure_async(func):
@@ -37,49 +38,123 @@ data_agregator_agent = LlmAgent(
     ],
 )
 
-# Agent loop function for FastAPI route
-async def agent_loop(user_query: str, session_id: str, user_id: str) -> str:
-    """
-    Run the ADK agent with the given user query and session/user context.
-    """
-    # You may want to pass session_id and user_id as part of the context if supported by ADK
-    result = await data_agregator_agent.run(user_query)
-    return result
-async def agent_loop(user_query: str, session_id: str, user_id: str) -> str:
-    memory = []
-    # Step 1: Ask Gemini what tool to use
-    reasoning_prompt = f"""
+# Tool implementations: each takes the args dict decoded from the LLM reply
+async def _fetch_net_worth(args: Dict[str, Any]):
+    from app.services.mcp_client import MCPClient
+    async with MCPClient() as client:
+        return await client.fetch_net_worth(args["session_id"])
+
+async def _fetch_mf_transactions(args: Dict[str, Any]):
+    from app.services.mcp_client import MCPClient
+    async with MCPClient() as client:
+        return await client.fetch_mf_transactions(args["session_id"])
+
+async def _query_vector_db(args: Dict[str, Any]):
+    global _vector_search
+    if _vector_search is None:
+        from app.services.vector_search import VectorSearchService
+        _vector_search = VectorSearchService()
+    return await _vector_search.search_by_text(args["query"], num_neighbors=5)
+
+async def _fetch_stock_data(args: Dict[str, Any]):
+    from app.services.market_data import market_data_service
+    return await market_data_service.get_quote(args["symbol"])
+
+async def _analyze_screentime(args: Dict[str, Any]):
+    # Imported lazily: the screentime integration lives in the routes package
+    from app.routes.screentime import get_activity_report
+    return await get_activity_report()
+
+# Single source of truth for the tools: registry, validation set and the
+# numbered list rendered into the prompt all derive from these specs
+_TOOL_SPECS = [
+    ("fetch_net_worth", "session_id", _fetch_net_worth),
+    ("fetch_mf_transactions", "session_id", _fetch_mf_transactions),
+    ("query_vector_db", "query", _query_vector_db),
+    ("fetch_stock_data", "symbol", _fetch_stock_data),
+    ("analyze_screentime", "user_id", _analyze_screentime),
+]
+TOOL_REGISTRY = {name: func for name, _, func in _TOOL_SPECS}
+_TOOL_NAMES = frozenset(TOOL_REGISTRY)
+_TOOL_DOCS = "\n".join(f"    {i}. {name}({arg})"
+                       for i, (name, arg, _) in enumerate(_TOOL_SPECS, 1))
+
+# Fixed parts of the tool-selection prompt, built once at import instead
+# of re-allocating the full f-string on every call
+_REASONING_HEADER = f"""
     You are a financial AI assistant with access to the following tools:
 
-    1. fetch_net_worth(session_id)
-    2. fetch_mf_transactions(session_id)
-    3. query_vector_db(query)
-    4. fetch_stock_data(symbol)
-    5. analyze_screentime(user_id)
+{_TOOL_DOCS}
 
     Based on the user's question, pick the best tool and required args.
+"""
 
-    Question: {user_query}
-    Session ID: {session_id}
-    User ID: {user_id}
-
+_REASONING_FOOTER = """
     Respond strictly in JSON:
-    {{
+    {
         "tool": "<tool_name>",
-        "args": {{"arg1": "value", ...}}
-    }}
+        "args": {"arg1": "value", ...}
+    }
     """
-    tool_decision_raw = await chat_with_gemini(reasoning_prompt)
+
+def _extract_json(raw: str) -> Dict[str, Any]:
+    """
+    Pull the first JSON object out of an LLM reply, tolerating Markdown
+    fences and surrounding commentary.
+    """
+    cleaned = raw.strip().removeprefix('```json').removeprefix('```').removesuffix('```')
+    start, end = cleaned.find('{'), cleaned.rfind('}')
+    if start == -1 or end == -1:
+        raise ValueError("no JSON object found in model reply")
+    return orjson.loads(cleaned[start:end + 1])
+
+# Lazily-created vector search service for speculative retrieval
+_vector_search = None
+
+async def _speculative_vector_lookup(query: str):
+    """
+    Start a vector-DB retrieval for the raw question while Gemini is still
+    picking a tool; if it chooses query_vector_db the result is already here.
+    """
+    global _vector_search
+    try:
+        if _vector_search is None:
+            from app.services.vector_search import VectorSearchService
+            _vector_search = VectorSearchService()
+        return await _vector_search.search_by_text(query, num_neighbors=5)
+    except Exception:
+        # Speculation is best-effort; the tool call below is the fallback
+        return None
+
+# Agent loop function for FastAPI route
+async def agent_loop(user_query: str, session_id: str, user_id: str) -> str:
+    memory = []
+    # Step 1: Ask Gemini what tool to use, overlapping the LLM round-trip
+    # with a speculative retrieval for the likely vector-DB case
+    reasoning_prompt = _REASONING_HEADER + f"""
+    Question: {user_query}
+    Session ID: {session_id}
+    User ID: {user_id}
+""" + _REASONING_FOOTER
+    tool_decision_raw, speculative_results = await asyncio.gather(
+        chat_with_gemini(reasoning_prompt),
+        _speculative_vector_lookup(user_query)
+    )
     try:
-        decision = json.loads(tool_decision_raw)
+        decision = _extract_json(tool_decision_raw)
         tool_name = decision["tool"]
         args = decision["args"]
-        assert tool_name in TOOL_REGISTRY, "Invalid tool selected by LLM"
     except Exception as e:
         return f"⚠️ Error: Tool selection failed - {e}"
-    # Step 2: Call tool
+    # Explicit check instead of assert (asserts vanish under python -O)
+    if tool_name not in _TOOL_NAMES:
+        return f"⚠️ Error: Tool selection failed - invalid tool '{tool_name}'"
+    # Step 2: Call tool (reusing the speculative retrieval when it applies)
     try:
-        result = await TOOL_REGISTRY[tool_name](args)
+        if tool_name == "query_vector_db" and speculative_results is not None:
+            result = speculative_results
+        else:
+            result = await TOOL_REGISTRY[tool_name](args)
         memory.append({"tool": tool_name, "input": args, "output": result})
     except Exception as e:
         return f"❌ Tool '{tool_name}' failed to execute - {e}"
@@ -88,7 +163,7 @@ async def agent_loop(user_query: str, session_id: str, user_id: str) -> str:
     The user asked: {user_query}
     You used the tool: {tool_name}
     The result was:
-    {json.dumps(result, indent=2)}
+    {orjson.dumps(result, option=orjson.OPT_INDENT_2).decode()}
 
     Based on this, generate a friendly response to the user.
     """
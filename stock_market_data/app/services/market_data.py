@@ -1,16 +1,44 @@
-import requests
+import aiohttp
 import logging
 import asyncio
+import time
+from itertools import islice
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
-import time
-import json
+import orjson
 
 from app.config import settings
 from app.util.logger import get_logger
 
 logger = get_logger(__name__)
 
+def _pct(value: str) -> float:
+    """Parse Alpha Vantage percent strings like '1.23%'"""
+    return float(value[:-1]) if value.endswith('%') else float(value)
+
+# Alpha Vantage GLOBAL_QUOTE key map: (our key, AV key, parser). Built once
+# so the per-quote hot path is a single tight dict comprehension instead of
+# nine inline .get()/float() pairs
+_QUOTE_FIELDS = (
+    ('price', '05. price', float),
+    ('volume', '06. volume', int),
+    ('change', '09. change', float),
+    ('change_percent', '10. change percent', _pct),
+    ('high', '03. high', float),
+    ('low', '04. low', float),
+    ('open', '02. open', float),
+    ('previous_close', '08. previous close', float),
+)
+
+# OHLCV bar key map shared by the intraday and daily series parsers
+_BAR_FIELDS = (
+    ('open', '1. open', float),
+    ('high', '2. high', float),
+    ('low', '3. low', float),
+    ('close', '4. close', float),
+    ('volume', '5. volume', int),
+)
+
 class MarketDataService:
     """Service for fetching and managing market data from Alpha Vantage"""
     
@@ -22,10 +50,28 @@ class MarketDataService:
         # Initialize GCP clients only when needed
         self.publisher = None
         self.topic_path = None
+
+        # Shared HTTP session, created lazily inside the running event loop
+        self._session: Optional[aiohttp.ClientSession] = None
         
-        # Rate limiting (Alpha Vantage free tier: 5 calls per minute)
+        # Rate limiting (Alpha Vantage free tier: 5 calls per minute).
+        # Token bucket: the semaphore starts full, each request consumes a
+        # token, and a background task returns one every 60/N seconds, so up
+        # to N requests can be in flight at once without bursting past quota.
         self.calls_per_minute = 5
-        self.call_timestamps = []
+        self._rl_sem = asyncio.Semaphore(self.calls_per_minute)
+        self._rl_available = self.calls_per_minute
+        self._rl_refill_task = None
+
+        # In-flight quote fetches, keyed by symbol
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        # Short-TTL quote cache: symbol -> (fetched_at, quote_data). Symbols
+        # come from callers, so cap the size and start over when full rather
+        # than growing without bound
+        self._quote_cache: Dict[str, tuple] = {}
+        self._quote_cache_ttl = 5.0
+        self._quote_cache_max = 10_000
         
         # Popular Indian stocks for default data
         self.default_symbols = [
@@ -33,36 +79,91 @@ class MarketDataService:
             "HINDUNILVR.BSE", "ITC.BSE", "SBIN.BSE", "BHARTIARTL.BSE", "KOTAKBANK.BSE"
         ]
     
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared aiohttp session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=20, limit_per_host=10, ttl_dns_cache=300,
+                    keepalive_timeout=60, enable_cleanup_closed=True),
+                timeout=aiohttp.ClientTimeout(total=10)
+            )
+        return self._session
+
+    async def close(self):
+        """Close the shared HTTP session (call on app shutdown)"""
+        if self._rl_refill_task and not self._rl_refill_task.done():
+            self._rl_refill_task.cancel()
+        if self._session and not self._session.closed:
+            await self._session.close()
+
     def _initialize_gcp_clients(self):
         """Initialize GCP clients if not already done"""
         try:
             if not self.publisher:
-                from google.cloud import pubsub_v1
-                self.publisher = pubsub_v1.PublisherClient()
+                # Reuse the process-wide publisher instead of opening a
+                # second gRPC channel
+                from app.services.pubsub_consumer import get_shared_gcp_clients
+                self.publisher = get_shared_gcp_clients()['publisher']
                 self.topic_path = self.publisher.topic_path(self.project_id, settings.PUBSUB_MARKET_DATA_TOPIC)
             return True
         except Exception as e:
             logger.warning(f"Failed to initialize GCP clients: {e}")
             return False
     
-    def _check_rate_limit(self):
-        """Check and enforce rate limiting"""
-        current_time = time.time()
-        # Remove timestamps older than 1 minute
-        self.call_timestamps = [ts for ts in self.call_timestamps if current_time - ts < 60]
-        
-        if len(self.call_timestamps) >= self.calls_per_minute:
-            sleep_time = 60 - (current_time - self.call_timestamps[0])
-            if sleep_time > 0:
-                logger.warning(f"Rate limit reached. Sleeping for {sleep_time:.2f} seconds")
-                time.sleep(sleep_time)
-        
-        self.call_timestamps.append(current_time)
+    async def _refill_tokens(self):
+        """Return one rate-limit token every 60/calls_per_minute seconds"""
+        interval = 60 / self.calls_per_minute
+        while True:
+            await asyncio.sleep(interval)
+            if self._rl_available < self.calls_per_minute:
+                self._rl_sem.release()
+                self._rl_available += 1
     
-    async def get_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
-        """Get real-time quote for a symbol"""
+    async def _acquire_token(self):
+        """Take a rate-limit token, waiting for the refill task if empty"""
+        if self._rl_refill_task is None or self._rl_refill_task.done():
+            self._rl_refill_task = asyncio.create_task(self._refill_tokens())
+        await self._rl_sem.acquire()
+        self._rl_available -= 1
+    
+    async def get_quote(self, symbol: str, _now: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get real-time quote for a symbol.
+
+        _now lets batch callers pass one precomputed ISO timestamp instead
+        of paying a datetime.utcnow().isoformat() per symbol.
+        """
+        # Serve repeated reads from the short-TTL cache before touching the
+        # network; quotes don't move faster than this window anyway
+        entry = self._quote_cache.get(symbol)
+        if entry and time.monotonic() - entry[0] < self._quote_cache_ttl:
+            return entry[1]
+
+        # Coalesce concurrent calls for the same symbol onto one fetch so
+        # duplicates share the result instead of burning rate-limit tokens
+        inflight = self._inflight.get(symbol)
+        if inflight is not None:
+            return await inflight
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[symbol] = fut
         try:
-            self._check_rate_limit()
+            quote_data = await self._fetch_quote(symbol, _now)
+            if quote_data is not None:
+                if len(self._quote_cache) >= self._quote_cache_max:
+                    self._quote_cache.clear()
+                self._quote_cache[symbol] = (time.monotonic(), quote_data)
+            fut.set_result(quote_data)
+            return quote_data
+        finally:
+            self._inflight.pop(symbol, None)
+            if not fut.done():
+                fut.cancel()
+
+    async def _fetch_quote(self, symbol: str, _now: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Fetch a quote from Alpha Vantage (no in-flight deduplication)"""
+        try:
+            await self._acquire_token()
             
             params = {
                 'function': 'GLOBAL_QUOTE',
@@ -70,10 +171,10 @@ class MarketDataService:
                 'apikey': self.api_key
             }
             
-            response = requests.get(self.base_url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
+            session = self._get_session()
+            async with session.get(self.base_url, params=params) as response:
+                response.raise_for_status()
+                data = orjson.loads(await response.read())
             
             if 'Global Quote' not in data or not data['Global Quote']:
                 logger.warning(f"No quote data available for {symbol}")
@@ -82,24 +183,16 @@ class MarketDataService:
             quote = data['Global Quote']
             
             # Parse and validate the quote data
-            quote_data = {
-                'symbol': symbol,
-                'price': float(quote.get('05. price', 0)),
-                'volume': int(quote.get('06. volume', 0)),
-                'change': float(quote.get('09. change', 0)),
-                'change_percent': float(quote.get('10. change percent', '0%').rstrip('%')),
-                'high': float(quote.get('03. high', 0)),
-                'low': float(quote.get('04. low', 0)),
-                'open': float(quote.get('02. open', 0)),
-                'previous_close': float(quote.get('08. previous close', 0)),
-                'timestamp': datetime.utcnow().isoformat(),
-                'market': 'BSE' if '.BSE' in symbol else 'NSE'
-            }
+            quote_data = {key: cast(quote.get(av_key, '0'))
+                          for key, av_key, cast in _QUOTE_FIELDS}
+            quote_data['symbol'] = symbol
+            quote_data['timestamp'] = _now or datetime.utcnow().isoformat()
+            quote_data['market'] = 'BSE' if symbol.endswith('.BSE') else 'NSE'
             
             logger.debug(f"Retrieved quote for {symbol}: {quote_data['price']}")
             return quote_data
             
-        except requests.RequestException as e:
+        except aiohttp.ClientError as e:
             logger.error(f"API request failed for {symbol}: {e}")
             return None
         except (ValueError, KeyError) as e:
@@ -112,7 +205,7 @@ class MarketDataService:
     async def get_intraday_data(self, symbol: str, interval: str = "5min") -> Optional[Dict[str, Any]]:
         """Get intraday data for a symbol"""
         try:
-            self._check_rate_limit()
+            await self._acquire_token()
             
             params = {
                 'function': 'TIME_SERIES_INTRADAY',
@@ -121,10 +214,10 @@ class MarketDataService:
                 'apikey': self.api_key
             }
             
-            response = requests.get(self.base_url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
+            session = self._get_session()
+            async with session.get(self.base_url, params=params) as response:
+                response.raise_for_status()
+                data = orjson.loads(await response.read())
             
             if 'Time Series (5min)' not in data:
                 logger.warning(f"No intraday data available for {symbol}")
@@ -132,20 +225,14 @@ class MarketDataService:
             
             time_series = data['Time Series (5min)']
             
-            # Convert to list format
+            # Alpha Vantage returns newest-first; building from the
+            # reversed items view gives chronological order without a sort
             intraday_data = []
-            for timestamp, values in time_series.items():
-                intraday_data.append({
-                    'timestamp': timestamp,
-                    'open': float(values.get('1. open', 0)),
-                    'high': float(values.get('2. high', 0)),
-                    'low': float(values.get('3. low', 0)),
-                    'close': float(values.get('4. close', 0)),
-                    'volume': int(values.get('5. volume', 0))
-                })
-            
-            # Sort by timestamp
-            intraday_data.sort(key=lambda x: x['timestamp'])
+            for timestamp, values in reversed(time_series.items()):
+                bar = {key: cast(values.get(av_key, '0'))
+                       for key, av_key, cast in _BAR_FIELDS}
+                bar['timestamp'] = timestamp
+                intraday_data.append(bar)
             
             return {
                 'symbol': symbol,
@@ -154,7 +241,7 @@ class MarketDataService:
                 'last_updated': datetime.utcnow().isoformat()
             }
             
-        except requests.RequestException as e:
+        except aiohttp.ClientError as e:
             logger.error(f"Intraday API request failed for {symbol}: {e}")
             return None
         except Exception as e:
@@ -164,7 +251,7 @@ class MarketDataService:
     async def get_daily_data(self, symbol: str, days: int = 30) -> Optional[Dict[str, Any]]:
         """Get daily historical data for a symbol"""
         try:
-            self._check_rate_limit()
+            await self._acquire_token()
             
             params = {
                 'function': 'TIME_SERIES_DAILY',
@@ -172,10 +259,10 @@ class MarketDataService:
                 'apikey': self.api_key
             }
             
-            response = requests.get(self.base_url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
+            session = self._get_session()
+            async with session.get(self.base_url, params=params) as response:
+                response.raise_for_status()
+                data = orjson.loads(await response.read())
             
             if 'Time Series (Daily)' not in data:
                 logger.warning(f"No daily data available for {symbol}")
@@ -183,20 +270,18 @@ class MarketDataService:
             
             time_series = data['Time Series (Daily)']
             
-            # Convert to list format and limit to requested days
-            daily_data = []
-            for timestamp, values in list(time_series.items())[:days]:
-                daily_data.append({
-                    'date': timestamp,
-                    'open': float(values.get('1. open', 0)),
-                    'high': float(values.get('2. high', 0)),
-                    'low': float(values.get('3. low', 0)),
-                    'close': float(values.get('4. close', 0)),
-                    'volume': int(values.get('5. volume', 0))
-                })
+            # Newest-first from the API: take the most recent `days`
+            # entries without materializing the full series, then reverse
+            # into chronological order (no sort)
+            recent = list(islice(time_series.items(), days))
+            recent.reverse()
             
-            # Sort by date
-            daily_data.sort(key=lambda x: x['date'])
+            daily_data = []
+            for timestamp, values in recent:
+                bar = {key: cast(values.get(av_key, '0'))
+                       for key, av_key, cast in _BAR_FIELDS}
+                bar['date'] = timestamp
+                daily_data.append(bar)
             
             return {
                 'symbol': symbol,
@@ -204,7 +289,7 @@ class MarketDataService:
                 'last_updated': datetime.utcnow().isoformat()
             }
             
-        except requests.RequestException as e:
+        except aiohttp.ClientError as e:
             logger.error(f"Daily API request failed for {symbol}: {e}")
             return None
         except Exception as e:
@@ -218,9 +303,8 @@ class MarketDataService:
             return False
         
         try:
-            data_json = json.dumps(data).encode('utf-8')
-            future = self.publisher.publish(self.topic_path, data=data_json)
-            message_id = future.result()
+            future = self.publisher.publish(self.topic_path, data=orjson.dumps(data))
+            message_id = await asyncio.wrap_future(future)
             
             logger.info(f"Published market data to Pub/Sub: {message_id}")
             return True
@@ -234,24 +318,19 @@ class MarketDataService:
         if symbols is None:
             symbols = self.default_symbols[:5]  # Limit to 5 for rate limiting
         
-        quotes = []
-        total_change = 0
-        total_volume = 0
+        # One timestamp for the whole batch instead of one syscall per quote
+        now_iso = datetime.utcnow().isoformat()
         
-        for symbol in symbols:
-            quote = await self.get_quote(symbol)
-            if quote:
-                quotes.append(quote)
-                total_change += quote['change']
-                total_volume += quote['volume']
-            
-            await asyncio.sleep(0.5)  # Rate limiting
+        # Fetch concurrently; the token bucket enforces the API quota, so
+        # there is no need to sleep between symbols
+        results = await asyncio.gather(*(self.get_quote(symbol, _now=now_iso) for symbol in symbols))
+        quotes = [quote for quote in results if quote]
         
         return {
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': now_iso,
             'total_symbols': len(quotes),
-            'total_change': total_change,
-            'total_volume': total_volume,
+            'total_change': sum(quote['change'] for quote in quotes),
+            'total_volume': sum(quote['volume'] for quote in quotes),
             'quotes': quotes
         }
     
@@ -266,23 +345,32 @@ class MarketDataService:
             'published': 0
         }
         
-        for symbol in symbols:
-            try:
-                quote = await self.get_quote(symbol)
-                if quote:
-                    results['success'].append(symbol)
-                    
-                    # Try to publish to Pub/Sub
-                    if await self.publish_to_pubsub(quote):
-                        results['published'] += 1
-                else:
-                    results['failed'].append(symbol)
-                
-                await asyncio.sleep(0.5)  # Rate limiting
-                
-            except Exception as e:
-                logger.error(f"Error updating {symbol}: {e}")
+        # One timestamp for the whole batch instead of one syscall per quote
+        now_iso = datetime.utcnow().isoformat()
+        
+        # Fetch concurrently; the token bucket enforces the API quota
+        quotes = await asyncio.gather(
+            *(self.get_quote(symbol, _now=now_iso) for symbol in symbols),
+            return_exceptions=True
+        )
+        
+        to_publish = []
+        for symbol, quote in zip(symbols, quotes):
+            if isinstance(quote, Exception):
+                logger.error(f"Error updating {symbol}: {quote}")
                 results['failed'].append(symbol)
+            elif quote:
+                results['success'].append(symbol)
+                to_publish.append(quote)
+            else:
+                results['failed'].append(symbol)
+        
+        # Publish concurrently so the client batcher can coalesce them
+        published = await asyncio.gather(
+            *(self.publish_to_pubsub(quote) for quote in to_publish),
+            return_exceptions=True
+        )
+        results['published'] = sum(1 for ok in published if ok is True)
         
         return results
 
@@ -1,14 +1,133 @@
 import asyncio
-import json
 import logging
+import queue
+import threading
+import time
+
+import orjson
 from datetime import datetime
 from typing import Dict, Any, Optional
 
 from app.config import settings
 from app.util.logger import get_logger
 
+# GCP libraries are optional at runtime; import them once here instead of
+# inside every method, keeping the existing no-GCP fallback behavior
+try:
+    from google.cloud import pubsub_v1, firestore, bigquery
+except ImportError:
+    pubsub_v1 = firestore = bigquery = None
+
 logger = get_logger(__name__)
 
+# One set of GCP clients per process: every PubSubConsumer (and the market
+# data service) shares these, so credentials and gRPC channels are set up
+# once instead of per instance
+_shared_clients = None
+
+def get_shared_gcp_clients():
+    """Create the shared publisher/Firestore/BigQuery clients on first use"""
+    global _shared_clients
+    if _shared_clients is None:
+        if pubsub_v1 is None:
+            raise ImportError("google-cloud libraries are not installed")
+        _shared_clients = {
+            # Let the client coalesce outbound messages instead of one RPC
+            # per publish: flush at 100 messages / 1 MiB / 50ms latency
+            'publisher': pubsub_v1.PublisherClient(
+                batch_settings=pubsub_v1.types.BatchSettings(
+                    max_messages=100, max_bytes=1 << 20, max_latency=0.05)),
+            'firestore': firestore.Client(project=settings.GCP_PROJECT_ID),
+            'bigquery': bigquery.Client(project=settings.GCP_PROJECT_ID),
+        }
+    return _shared_clients
+
+def _subscribe(subscriber, subscription_path, callback):
+    """Subscribe with tuned flow control and a bounded callback pool.
+
+    The default subscriber setup caps callback concurrency well below what
+    the batched Firestore/BigQuery writes can absorb; allow up to 500
+    outstanding messages and run callbacks on a 16-thread scheduler.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from google.cloud.pubsub_v1.subscriber.scheduler import ThreadScheduler
+    from google.cloud.pubsub_v1.types import FlowControl
+    
+    return subscriber.subscribe(
+        subscription_path,
+        callback=callback,
+        flow_control=FlowControl(max_messages=500, max_bytes=50 * 1024 * 1024),
+        scheduler=ThreadScheduler(executor=ThreadPoolExecutor(max_workers=16)),
+    )
+
+class _WriteBuffer:
+    """Accumulates (row, message) pairs from Pub/Sub callbacks and flushes
+    them through a single batched write.
+
+    Drained batches go through max_rows (kept below the 500-op Firestore
+    WriteBatch limit for headroom) or, via the periodic flush_if_stale()
+    sweep, once the oldest buffered row has waited max_wait seconds. Full
+    batches are handed to the writer thread via flush_q so subscriber
+    callbacks return immediately instead of holding a flow-control slot
+    through the network writes. Messages are acked only after their batch
+    is written, nacked if the write fails.
+    """
+
+    def __init__(self, flush_fn, flush_q, max_rows: int = 400, max_wait: float = 0.5):
+        self._flush_fn = flush_fn
+        self._flush_q = flush_q
+        self._max_rows = max_rows
+        self._max_wait = max_wait
+        self._lock = threading.Lock()
+        self._buf = []
+        self._first_enqueue_ts = None
+
+    def add(self, data: Dict[str, Any], message):
+        with self._lock:
+            if not self._buf:
+                self._first_enqueue_ts = time.monotonic()
+            self._buf.append((data, message))
+            buf = self._drain_locked() if len(self._buf) >= self._max_rows else None
+        if buf:
+            self._submit(buf)
+
+    def flush_if_stale(self):
+        with self._lock:
+            stale = (self._buf and
+                     time.monotonic() - self._first_enqueue_ts >= self._max_wait)
+            buf = self._drain_locked() if stale else None
+        if buf:
+            self._submit(buf)
+
+    def flush(self):
+        """Drain and write synchronously (used on shutdown)"""
+        with self._lock:
+            buf = self._drain_locked()
+        if buf:
+            self.run_flush(buf)
+
+    def _submit(self, buf):
+        try:
+            self._flush_q.put_nowait((self, buf))
+        except queue.Full:
+            # Backpressure: write inline rather than drop the batch
+            self.run_flush(buf)
+
+    def _drain_locked(self):
+        buf, self._buf, self._first_enqueue_ts = self._buf, [], None
+        return buf
+
+    def run_flush(self, buf):
+        try:
+            self._flush_fn([row for row, _ in buf])
+        except Exception as e:
+            logger.error(f"Batched write of {len(buf)} rows failed: {e}")
+            for _, message in buf:
+                message.nack()
+            return
+        for _, message in buf:
+            message.ack()
+
 class PubSubConsumer:
     """Consumer for Google Cloud Pub/Sub topics"""
     
@@ -20,24 +139,36 @@ class PubSubConsumer:
         self.firestore_client = None
         self.bigquery_client = None
         
+        # Topic paths, resolved once alongside the publisher
+        self._market_topic_path = None
+        self._screentime_topic_path = None
+        
         # Consumer tasks
         self.consumer_tasks = []
         self.running = False
+        
+        # Write buffers drained by the dedicated writer thread
+        self._write_buffers = []
+        self._flush_q = queue.Queue(maxsize=10000)
+        self._writer_thread = None
     
     def _initialize_gcp_clients(self):
         """Initialize GCP clients if not already done"""
         try:
+            clients = get_shared_gcp_clients()
+            
             if not self.publisher:
-                from google.cloud import pubsub_v1
-                self.publisher = pubsub_v1.PublisherClient()
+                self.publisher = clients['publisher']
+                self._market_topic_path = self.publisher.topic_path(
+                    self.project_id, settings.PUBSUB_MARKET_DATA_TOPIC)
+                self._screentime_topic_path = self.publisher.topic_path(
+                    self.project_id, settings.PUBSUB_SCREENTIME_TOPIC)
             
             if not self.firestore_client:
-                from google.cloud import firestore
-                self.firestore_client = firestore.Client(project=self.project_id)
+                self.firestore_client = clients['firestore']
             
             if not self.bigquery_client:
-                from google.cloud import bigquery
-                self.bigquery_client = bigquery.Client(project=self.project_id)
+                self.bigquery_client = clients['bigquery']
             
             return True
         except Exception as e:
@@ -65,6 +196,12 @@ class PubSubConsumer:
             )
             self.consumer_tasks.append(screentime_task)
             
+            # Drain batched writes on a dedicated thread so neither the
+            # event loop nor the subscriber callbacks block on Firestore
+            # or BigQuery round trips
+            self._writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+            self._writer_thread.start()
+            
             logger.info("Pub/Sub consumers started successfully")
             
         except Exception as e:
@@ -84,8 +221,47 @@ class PubSubConsumer:
             await asyncio.gather(*self.consumer_tasks, return_exceptions=True)
             self.consumer_tasks.clear()
         
+        if self._writer_thread and self._writer_thread.is_alive():
+            self._writer_thread.join(timeout=2.0)
+        self._writer_thread = None
+        
+        # Drain whatever is still buffered before shutting down
+        for buffer in self._write_buffers:
+            buffer.flush()
+        
         logger.info("Pub/Sub consumers stopped")
     
+    def _writer_loop(self):
+        """Writer thread: execute queued batch flushes and sweep stale buffers"""
+        while self.running:
+            try:
+                buffer, batch = self._flush_q.get(timeout=0.1)
+            except queue.Empty:
+                pass
+            else:
+                buffer.run_flush(batch)
+            for buffer in self._write_buffers:
+                buffer.flush_if_stale()
+        
+        # Drain any jobs still queued at shutdown
+        while True:
+            try:
+                buffer, batch = self._flush_q.get_nowait()
+            except queue.Empty:
+                break
+            buffer.run_flush(batch)
+    
+    def _get_table(self, table_name: str):
+        """Fetch a BigQuery Table once so callbacks skip the per-message lookup"""
+        if not self.bigquery_client:
+            return None
+        table_id = f"{self.project_id}.{settings.BIGQUERY_DATASET}.{table_name}"
+        try:
+            return self.bigquery_client.get_table(table_id)
+        except Exception as e:
+            logger.warning(f"Failed to fetch BigQuery table {table_id}: {e}")
+            return None
+    
     async def _consume_market_data(self):
         """Consume market data from Pub/Sub"""
         if not self._initialize_gcp_clients():
@@ -93,44 +269,42 @@ class PubSubConsumer:
             return
         
         try:
-            from google.cloud import pubsub_v1
-            
             subscriber = pubsub_v1.SubscriberClient()
             subscription_path = subscriber.subscription_path(
                 self.project_id, 
                 settings.PUBSUB_MARKET_DATA_SUBSCRIPTION
             )
             
+            table = self._get_table(settings.BIGQUERY_MARKET_TABLE)
+            
+            def store_rows(rows):
+                # Store in Firestore as one WriteBatch
+                if self.firestore_client:
+                    batch = self.firestore_client.batch()
+                    for data in rows:
+                        doc_ref = self.firestore_client.collection('market_data').document(data.get('symbol', 'unknown'))
+                        batch.set(doc_ref, data)
+                    batch.commit()
+                
+                # Store in BigQuery as one streaming insert
+                if table is not None:
+                    errors = self.bigquery_client.insert_rows_json(table, rows)
+                    if errors:
+                        logger.error(f"BigQuery insert errors: {errors}")
+            
+            buffer = _WriteBuffer(store_rows, self._flush_q)
+            self._write_buffers.append(buffer)
+            
             def callback(message):
                 try:
-                    data = json.loads(message.data.decode('utf-8'))
+                    data = orjson.loads(message.data)
                     logger.info(f"Received market data: {data.get('symbol', 'unknown')}")
-                    
-                    # Store in Firestore
-                    if self.firestore_client:
-                        doc_ref = self.firestore_client.collection('market_data').document(data.get('symbol', 'unknown'))
-                        doc_ref.set(data)
-                    
-                    # Store in BigQuery
-                    if self.bigquery_client:
-                        table_id = f"{self.project_id}.{settings.BIGQUERY_DATASET}.{settings.BIGQUERY_MARKET_TABLE}"
-                        table = self.bigquery_client.get_table(table_id)
-                        
-                        rows_to_insert = [data]
-                        errors = self.bigquery_client.insert_rows_json(table, rows_to_insert)
-                        
-                        if errors:
-                            logger.error(f"BigQuery insert errors: {errors}")
-                    
-                    message.ack()
-                    
+                    buffer.add(data, message)
                 except Exception as e:
                     logger.error(f"Error processing market data message: {e}")
                     message.nack()
             
-            streaming_pull_future = subscriber.subscribe(
-                subscription_path, callback=callback
-            )
+            streaming_pull_future = _subscribe(subscriber, subscription_path, callback)
             
             logger.info(f"Listening for market data on {subscription_path}")
             
@@ -151,44 +325,42 @@ class PubSubConsumer:
             return
         
         try:
-            from google.cloud import pubsub_v1
-            
             subscriber = pubsub_v1.SubscriberClient()
             subscription_path = subscriber.subscription_path(
                 self.project_id, 
                 settings.PUBSUB_SCREENTIME_SUBSCRIPTION
             )
             
+            table = self._get_table(settings.BIGQUERY_SCREENTIME_TABLE)
+            
+            def store_rows(rows):
+                # Store in Firestore as one WriteBatch
+                if self.firestore_client:
+                    batch = self.firestore_client.batch()
+                    for data in rows:
+                        doc_ref = self.firestore_client.collection('screentime_data').document()
+                        batch.set(doc_ref, data)
+                    batch.commit()
+                
+                # Store in BigQuery as one streaming insert
+                if table is not None:
+                    errors = self.bigquery_client.insert_rows_json(table, rows)
+                    if errors:
+                        logger.error(f"BigQuery insert errors: {errors}")
+            
+            buffer = _WriteBuffer(store_rows, self._flush_q)
+            self._write_buffers.append(buffer)
+            
             def callback(message):
                 try:
-                    data = json.loads(message.data.decode('utf-8'))
+                    data = orjson.loads(message.data)
                     logger.info(f"Received screen time data: {data.get('user_id', 'unknown')}")
-                    
-                    # Store in Firestore
-                    if self.firestore_client:
-                        doc_ref = self.firestore_client.collection('screentime_data').document()
-                        doc_ref.set(data)
-                    
-                    # Store in BigQuery
-                    if self.bigquery_client:
-                        table_id = f"{self.project_id}.{settings.BIGQUERY_DATASET}.{settings.BIGQUERY_SCREENTIME_TABLE}"
-                        table = self.bigquery_client.get_table(table_id)
-                        
-                        rows_to_insert = [data]
-                        errors = self.bigquery_client.insert_rows_json(table, rows_to_insert)
-                        
-                        if errors:
-                            logger.error(f"BigQuery insert errors: {errors}")
-                    
-                    message.ack()
-                    
+                    buffer.add(data, message)
                 except Exception as e:
                     logger.error(f"Error processing screen time message: {e}")
                     message.nack()
             
-            streaming_pull_future = subscriber.subscribe(
-                subscription_path, callback=callback
-            )
+            streaming_pull_future = _subscribe(subscriber, subscription_path, callback)
             
             logger.info(f"Listening for screen time data on {subscription_path}")
             
@@ -209,12 +381,11 @@ class PubSubConsumer:
             return False
         
         try:
-            topic_path = self.publisher.topic_path(self.project_id, settings.PUBSUB_MARKET_DATA_TOPIC)
+            future = self.publisher.publish(self._market_topic_path, data=orjson.dumps(data))
             
-            data_json = json.dumps(data).encode('utf-8')
-            future = self.publisher.publish(topic_path, data=data_json)
-            
-            message_id = future.result()
+            # Await instead of future.result() so the batcher can fill up
+            # while other publishes run on the loop
+            message_id = await asyncio.wrap_future(future)
             logger.info(f"Published market data: {message_id}")
             return True
             
@@ -229,12 +400,9 @@ class PubSubConsumer:
             return False
         
         try:
-            topic_path = self.publisher.topic_path(self.project_id, settings.PUBSUB_SCREENTIME_TOPIC)
-            
-            data_json = json.dumps(data).encode('utf-8')
-            future = self.publisher.publish(topic_path, data=data_json)
+            future = self.publisher.publish(self._screentime_topic_path, data=orjson.dumps(data))
             
-            message_id = future.result()
+            message_id = await asyncio.wrap_future(future)
             logger.info(f"Published screen time data: {message_id}")
             return True
             
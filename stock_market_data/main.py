@@ -2,6 +2,9 @@ from market import router as market_router
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+import os
+import sys
+import time
 import uvicorn
 import logging
 from contextlib import asynccontextmanager
@@ -9,7 +12,7 @@ from contextlib import asynccontextmanager
 from app.config import settings
 from app.routes import auth, mcp, chat, rag, market, screentime, pubsub
 from app.routes.agent import router as agent_router
-from app.services.pubsub_consumer import PubSubConsumer
+from app.services.market_data import market_data_service
 from app.util.logger import setup_logging
 
 # Initialize logging
@@ -19,6 +22,17 @@ logger = logging.getLogger(__name__)
 # Security
 security = HTTPBearer()
 
+# Short-TTL session cache: token -> (cached_at, session_data). Every
+# authenticated request otherwise pays a Firestore query; chat/agent clients
+# reuse the same token many times a minute
+_SESSION_CACHE_TTL = 60.0
+_SESSION_CACHE_MAX = 10_000
+_session_cache = {}
+
+def invalidate_session_cache(token: str):
+    """Drop a cached session (called from the logout route)"""
+    _session_cache.pop(token, None)
+
 # Initialize GCP clients only when needed
 def get_firestore_client():
     """Get Firestore client, initializing it only when needed"""
@@ -34,6 +48,10 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     try:
         token = credentials.credentials
         
+        cached = _session_cache.get(token)
+        if cached and time.monotonic() - cached[0] < _SESSION_CACHE_TTL:
+            return cached[1]
+        
         # Try to query Firestore for session, but don't fail if not available
         db = get_firestore_client()
         if db:
@@ -48,7 +66,10 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
                 session_data = docs[0].to_dict()
                 if not session_data.get('active', False):
                     raise HTTPException(status_code=401, detail="Session expired")
-                    
+                
+                if len(_session_cache) >= _SESSION_CACHE_MAX:
+                    _session_cache.clear()
+                _session_cache[token] = (time.monotonic(), session_data)
                 return session_data
             except Exception as e:
                 logger.warning(f"Failed to query Firestore: {e}")
@@ -70,21 +91,29 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     logger.info("Starting Fi Financial Wellness Backend")
     
-    # Initialize Pub/Sub consumers only if GCP is available
+    # Initialize Pub/Sub consumers only if GCP is available, reusing the
+    # instance the pubsub routes already hold instead of creating a second
     try:
-        pubsub_consumer = PubSubConsumer()
+        pubsub_consumer = pubsub.pubsub_consumer
         await pubsub_consumer.start_consumers()
         logger.info("Pub/Sub consumers started successfully")
     except Exception as e:
         logger.warning(f"Failed to start Pub/Sub consumers: {e}")
         pubsub_consumer = None
-    
+
+    # Prime DNS/TCP for the screentime data paths (best-effort)
+    try:
+        await screentime.warm_connections(settings.SCREENTIME_BACKEND_URL)
+    except Exception as e:
+        logger.debug(f"Connection warmup failed: {e}")
+
     yield
     
     # Cleanup
     logger.info("Shutting down Fi Financial Wellness Backend")
     if pubsub_consumer:
         await pubsub_consumer.stop_consumers()
+    await market_data_service.close()
 
 # Create FastAPI app
 app = FastAPI(
@@ -132,5 +161,10 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=settings.DEBUG,
-        log_level="info"
+        # uvloop has no Windows support; "auto" falls back to asyncio there
+        loop="uvloop" if sys.platform != "win32" else "auto",
+        http="httptools",
+        log_level="info",
+        # reload and workers are mutually exclusive in uvicorn
+        workers=None if settings.DEBUG else (os.cpu_count() or 1)
     )
\ No newline at end of file
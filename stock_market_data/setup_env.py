@@ -7,6 +7,10 @@ Helps configure the .env file with your actual API keys
 import os
 import re
 
+# One compiled pattern covering every key this script rewrites: a single
+# pass over the .env content instead of one re.sub scan per key
+_ENV_RE = re.compile(r'^(ALPHA_VANTAGE_API_KEY|GCP_PROJECT_ID|JWT_SECRET_KEY)=.*$', re.M)
+
 def update_env_file():
     """Update the .env file with user input"""
     
@@ -31,23 +35,14 @@ def update_env_file():
         print("❌ API key is required!")
         return False
     
-    # Update the API key in .env content
-    content = re.sub(
-        r'ALPHA_VANTAGE_API_KEY=.*',
-        f'ALPHA_VANTAGE_API_KEY={api_key}',
-        content
-    )
-    
-    # Also set some basic values for testing
-    content = re.sub(
-        r'GCP_PROJECT_ID=.*',
-        'GCP_PROJECT_ID=test-project',
-        content
-    )
-    
-    content = re.sub(
-        r'JWT_SECRET_KEY=.*',
-        'JWT_SECRET_KEY=test-secret-key-for-development',
+    # Update the API key (plus basic test values) in one pass
+    replacements = {
+        'ALPHA_VANTAGE_API_KEY': api_key,
+        'GCP_PROJECT_ID': 'test-project',
+        'JWT_SECRET_KEY': 'test-secret-key-for-development',
+    }
+    content = _ENV_RE.sub(
+        lambda m: f"{m.group(1)}={replacements[m.group(1)]}",
         content
     )
     
@@ -64,7 +59,7 @@ def test_configuration():
     print("\n🧪 Testing configuration...")
     
     # Load environment variables
-    from dotenv import load_dotenv
+    from _fast_dotenv import load_dotenv
     load_dotenv()
     
     api_key = os.getenv('ALPHA_VANTAGE_API_KEY')
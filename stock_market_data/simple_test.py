@@ -6,7 +6,9 @@ Tests the API directly without complex configuration
 
 import os
 import requests
-from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from _fast_dotenv import load_dotenv
 
 def main():
     """Test Alpha Vantage API directly"""
@@ -36,9 +38,18 @@ def main():
         'apikey': api_key
     }
     
+    # Reuse one keep-alive connection (with retries) instead of paying a
+    # fresh TCP+TLS handshake per requests.get call
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(
+        pool_maxsize=16,
+        max_retries=Retry(total=3, backoff_factor=0.3,
+                          status_forcelist=[429, 500, 502, 503, 504])
+    ))
+    
     try:
         print(f"🔍 Testing API call for {symbol}...")
-        response = requests.get(base_url, params=params, timeout=10)
+        response = session.get(base_url, params=params, timeout=10)
         response.raise_for_status()
         
         data = response.json()
@@ -72,6 +83,8 @@ def main():
         print(f"❌ API request failed: {e}")
     except Exception as e:
         print(f"❌ Unexpected error: {e}")
+    finally:
+        session.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
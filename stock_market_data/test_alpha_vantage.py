@@ -7,6 +7,8 @@ import os
 import sys
 import asyncio
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
 
 # Add the app directory to the Python path
@@ -35,9 +37,18 @@ def test_alpha_vantage_api():
         'apikey': api_key
     }
     
+    # Reuse one keep-alive connection (with retries) instead of paying a
+    # fresh TCP+TLS handshake per requests.get call
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(
+        pool_maxsize=16,
+        max_retries=Retry(total=3, backoff_factor=0.3,
+                          status_forcelist=[429, 500, 502, 503, 504])
+    ))
+    
     try:
         print(f"🔍 Testing API call for {symbol}...")
-        response = requests.get(base_url, params=params, timeout=10)
+        response = session.get(base_url, params=params, timeout=10)
         response.raise_for_status()
         
         data = response.json()
@@ -60,6 +71,8 @@ def test_alpha_vantage_api():
     except Exception as e:
         print(f"❌ Unexpected error: {e}")
         return False
+    finally:
+        session.close()
 
 def test_market_data_service():
     """Test the market data service (requires minimal setup)"""
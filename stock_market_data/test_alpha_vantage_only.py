@@ -6,23 +6,44 @@ Test Alpha Vantage API Only (No GCP Required)
 import os
 import sys
 import asyncio
-import requests
-from datetime import datetime
-from dotenv import load_dotenv
+import math
+from collections import deque
 
-# Load environment variables
-load_dotenv()
+import aiohttp
+import orjson
+from datetime import datetime, timezone
+from _fast_dotenv import env
 
 class AlphaVantageOnly:
     """Alpha Vantage API client without GCP dependencies"""
     
+    # Alpha Vantage key map: (our key, AV key, parser, default), driving
+    # the quote parse as one comprehension instead of nine .get()/cast pairs
+    _FIELDS = (
+        ('price', '05. price', float, '0'),
+        ('volume', '06. volume', int, '0'),
+        ('change', '09. change', float, '0'),
+        ('change_percent', '10. change percent',
+         lambda v: float(v[:-1]) if v.endswith('%') else float(v), '0'),
+        ('high', '03. high', float, '0'),
+        ('low', '04. low', float, '0'),
+        ('open', '02. open', float, '0'),
+        ('previous_close', '08. previous close', float, '0'),
+    )
+    
     def __init__(self):
-        self.api_key = os.getenv('ALPHA_VANTAGE_API_KEY')
+        self.api_key = env().get('ALPHA_VANTAGE_API_KEY')
         self.base_url = "https://www.alphavantage.co/query"
         
+        # Shared aiohttp session (keep-alive pool), created lazily inside
+        # the running event loop
+        self._session = None
+        
         # Rate limiting (Alpha Vantage free tier: 5 calls per minute)
         self.calls_per_minute = 5
-        self.call_timestamps = []
+        self.call_timestamps = deque(maxlen=self.calls_per_minute)
+        self._rl_lock = asyncio.Lock()
+        self._quota_sem = asyncio.Semaphore(self.calls_per_minute)
         
         # Popular Indian stocks for default data
         self.default_symbols = [
@@ -30,25 +51,47 @@ class AlphaVantageOnly:
             "HINDUNILVR.BSE", "ITC.BSE", "SBIN.BSE", "BHARTIARTL.BSE", "KOTAKBANK.BSE"
         ]
     
-    def _check_rate_limit(self):
-        """Check and enforce rate limiting"""
-        import time
-        current_time = time.time()
-        # Remove timestamps older than 1 minute
-        self.call_timestamps = [ts for ts in self.call_timestamps if current_time - ts < 60]
-        
-        if len(self.call_timestamps) >= self.calls_per_minute:
-            sleep_time = 60 - (current_time - self.call_timestamps[0])
-            if sleep_time > 0:
-                print(f"⚠️  Rate limit reached. Sleeping for {sleep_time:.2f} seconds")
-                time.sleep(sleep_time)
-        
-        self.call_timestamps.append(current_time)
+    def _get_session(self):
+        """Get the shared aiohttp session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=16),
+                timeout=aiohttp.ClientTimeout(total=10)
+            )
+        return self._session
     
-    async def get_quote(self, symbol: str):
-        """Get real-time quote for a symbol"""
+    async def _await_slot(self):
+        """Wait for a rate-limit slot without blocking the event loop.
+
+        The lock keeps concurrent gather tasks from checking the window at
+        the same time and oversubscribing the quota.
+        """
+        async with self._rl_lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            # Drop timestamps older than 1 minute from the left of the window
+            while self.call_timestamps and now - self.call_timestamps[0] >= 60:
+                self.call_timestamps.popleft()
+            
+            if len(self.call_timestamps) >= self.calls_per_minute:
+                sleep_time = 60 - (now - self.call_timestamps[0])
+                if sleep_time > 0:
+                    print(f"⚠️  Rate limit reached. Sleeping for {sleep_time:.2f} seconds")
+                    await asyncio.sleep(sleep_time)
+                now = loop.time()
+                while self.call_timestamps and now - self.call_timestamps[0] >= 60:
+                    self.call_timestamps.popleft()
+            
+            self.call_timestamps.append(loop.time())
+    
+    async def get_quote(self, symbol: str, _ts: str = None):
+        """Get real-time quote for a symbol.
+
+        _ts lets get_market_summary stamp every quote in a snapshot with
+        one precomputed timestamp instead of building N near-identical ones.
+        """
         try:
-            self._check_rate_limit()
+            await self._await_slot()
             
             params = {
                 'function': 'GLOBAL_QUOTE',
@@ -56,10 +99,10 @@ class AlphaVantageOnly:
                 'apikey': self.api_key
             }
             
-            response = requests.get(self.base_url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
+            session = self._get_session()
+            async with session.get(self.base_url, params=params) as response:
+                response.raise_for_status()
+                data = orjson.loads(await response.read())
             
             if 'Global Quote' not in data or not data['Global Quote']:
                 print(f"⚠️  No quote data available for {symbol}")
@@ -68,23 +111,15 @@ class AlphaVantageOnly:
             quote = data['Global Quote']
             
             # Parse and validate the quote data
-            quote_data = {
-                'symbol': symbol,
-                'price': float(quote.get('05. price', 0)),
-                'volume': int(quote.get('06. volume', 0)),
-                'change': float(quote.get('09. change', 0)),
-                'change_percent': float(quote.get('10. change percent', '0%').rstrip('%')),
-                'high': float(quote.get('03. high', 0)),
-                'low': float(quote.get('04. low', 0)),
-                'open': float(quote.get('02. open', 0)),
-                'previous_close': float(quote.get('08. previous close', 0)),
-                'timestamp': datetime.utcnow().isoformat(),
-                'market': 'BSE' if '.BSE' in symbol else 'NSE'
-            }
+            quote_data = {name: cast(quote.get(key, default))
+                          for name, key, cast, default in self._FIELDS}
+            quote_data['symbol'] = symbol
+            quote_data['timestamp'] = _ts or datetime.now(timezone.utc).isoformat()
+            quote_data['market'] = 'BSE' if symbol.endswith('.BSE') else 'NSE'
             
             return quote_data
             
-        except requests.RequestException as e:
+        except aiohttp.ClientError as e:
             print(f"❌ API request failed for {symbol}: {e}")
             return None
         except (ValueError, KeyError) as e:
@@ -94,31 +129,43 @@ class AlphaVantageOnly:
             print(f"❌ Unexpected error for {symbol}: {e}")
             return None
     
+    async def _get_quote_limited(self, symbol, _ts=None):
+        """get_quote gated so at most calls_per_minute fetches are in flight"""
+        async with self._quota_sem:
+            return await self.get_quote(symbol, _ts=_ts)
+    
     async def get_market_summary(self, symbols=None):
         """Get a summary of market data for multiple symbols"""
         if symbols is None:
             symbols = self.default_symbols[:3]  # Limit to 3 for rate limiting
         
-        quotes = []
-        total_change = 0
-        total_volume = 0
+        # One snapshot timestamp for the whole summary
+        snapshot_ts = datetime.now(timezone.utc).isoformat()
         
-        for symbol in symbols:
-            quote = await self.get_quote(symbol)
-            if quote:
-                quotes.append(quote)
-                total_change += quote['change']
-                total_volume += quote['volume']
-            
-            await asyncio.sleep(0.5)  # Rate limiting
+        # Fire the fetches concurrently and let the semaphore plus the rate
+        # limiter pace them, instead of a serial loop with fixed sleeps
+        results = await asyncio.gather(
+            *(self._get_quote_limited(symbol, _ts=snapshot_ts) for symbol in symbols),
+            return_exceptions=True
+        )
+        quotes = [q for q in results if q and not isinstance(q, Exception)]
+        
+        # Totals in one pass over the final list (fsum for FP accuracy)
+        total_change = math.fsum(quote['change'] for quote in quotes)
+        total_volume = sum(quote['volume'] for quote in quotes)
         
         return {
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': snapshot_ts,
             'total_symbols': len(quotes),
             'total_change': total_change,
             'total_volume': total_volume,
             'quotes': quotes
         }
+    
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._session and not self._session.closed:
+            await self._session.close()
 
 async def main():
     """Main test function"""
@@ -127,7 +174,7 @@ async def main():
     print("=" * 50)
     
     # Check API key
-    api_key = os.getenv('ALPHA_VANTAGE_API_KEY')
+    api_key = env().get('ALPHA_VANTAGE_API_KEY')
     if not api_key:
         print("❌ ALPHA_VANTAGE_API_KEY not found in environment")
         return
@@ -172,6 +219,8 @@ async def main():
     else:
         print(f"❌ Failed to retrieve market summary")
     
+    await service.close()
+    
     print(f"\n🎉 Alpha Vantage API test completed successfully!")
     print(f"\n✅ Your Alpha Vantage integration is working perfectly!")
     print(f"\nNext steps:")
@@ -6,7 +6,7 @@ Test Market Data Service with Minimal Configuration
 import os
 import sys
 import asyncio
-from dotenv import load_dotenv
+from _fast_dotenv import load_dotenv
 
 # Add the app directory to the Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
@@ -74,17 +74,21 @@ async def continuous_update(interval_minutes: int = 5):
     """Continuously update market data at specified intervals"""
     logger.info(f"Starting continuous market data updates every {interval_minutes} minutes")
     
+    interval_seconds = interval_minutes * 60
+    loop = asyncio.get_running_loop()
+    # Fixed cadence on the monotonic clock: sleeping the full interval
+    # after each cycle would drift by the processing time every round
+    next_tick = loop.time() + interval_seconds
+    
     while True:
         try:
-            start_time = datetime.now()
-            logger.info(f"Starting update cycle at {start_time}")
+            t0 = loop.time()
+            logger.info(f"Starting update cycle at {datetime.now()}")
             
             # Update market data
             results = await update_market_data()
             
-            end_time = datetime.now()
-            duration = (end_time - start_time).total_seconds()
-            
+            duration = loop.time() - t0
             logger.info(f"Update cycle completed in {duration:.2f} seconds")
             
             if results['success']:
@@ -92,9 +96,11 @@ async def continuous_update(interval_minutes: int = 5):
             else:
                 logger.warning("Update cycle completed with errors")
             
-            # Wait for next cycle
-            logger.info(f"Waiting {interval_minutes} minutes until next update...")
-            await asyncio.sleep(interval_minutes * 60)
+            # Wait for the next tick, skipping any ticks we ran past
+            while next_tick <= loop.time():
+                next_tick += interval_seconds
+            logger.info(f"Waiting {next_tick - loop.time():.0f} seconds until next update...")
+            await asyncio.sleep(max(0, next_tick - loop.time()))
             
         except KeyboardInterrupt:
             logger.info("Continuous update stopped by user")